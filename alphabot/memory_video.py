@@ -1,34 +1,76 @@
+import queue
+import itertools
+import threading
 from solarpunk_memvid import SolarPunkMemvid
 
+from core.jsonio import json_dumps
+
+def ethical_score(trade_data):
+    """Score a trade: 0.7 for >=50% redistribution, 0.2 transparent, 0.1 non-extractive"""
+    return (
+        0.7 * (trade_data.get('redistribution_percentage', 0) >= 50)
+        + 0.2 * bool(trade_data.get('transparent', False))
+        + 0.1 * (not trade_data.get('extractive', True))
+    )
+
 class AlphaBotVideoMemory:
     def __init__(self):
         self.memory = SolarPunkMemvid("alphabot_memories.mp4")
         self.redistribution_log = []
         
+        # Frames are encoded on a background thread, off the trade path;
+        # frame_ids maps each submission id to its stored frame id
+        self.store_queue = queue.Queue()
+        self.submission_ids = itertools.count()
+        self.frame_ids = {}
+        self.lock = threading.Lock()
+        threading.Thread(target=self.drain_store_queue, daemon=True).start()
+        
     def log_trade(self, trade_data, ethical_analysis):
-        """Log a trade with ethical context"""
-        # Calculate ethical score
-        score = 0.0
-        if trade_data.get('redistribution_percentage', 0) >= 50:
-            score += 0.7
-        if trade_data.get('transparent', False):
-            score += 0.2
-        if not trade_data.get('extractive', True):
-            score += 0.1
-            
-        frame_id = self.memory.store(
-            data=json.dumps(trade_data),
-            context=f"trade_ethical:{score:.2f}",
-            ethical_score=score
-        )
+        """Log a trade with ethical context; returns a submission id, see get_frame_id"""
+        score = ethical_score(trade_data)
+        return self.store_trade(trade_data, score)
+    
+    def store_trade(self, trade_data, score):
+        """Queue a scored trade to be stored as a memory frame"""
+        # The memvid frame id is only known once the worker has stored the
+        # frame, so callers get a provisional submission id
+        submission_id = next(self.submission_ids)
+        self.store_queue.put((submission_id, json_dumps(trade_data), f"trade_ethical:{score:.2f}", score))
+        return submission_id
+    
+    def get_frame_id(self, submission_id, wait=False):
+        """Frame id stored for a submission, or None while pending or if storing failed"""
+        if wait:
+            self.store_queue.join()
         
-        if score > 0.7:
-            self.redistribution_log.append(frame_id)
-            
-        return frame_id
+        with self.lock:
+            return self.frame_ids.get(submission_id)
+    
+    def drain_store_queue(self):
+        """Store queued frames until the process exits"""
+        while True:
+            submission_id, data, context, score = self.store_queue.get()
+            try:
+                frame_id = self.memory.store(
+                    data=data,
+                    context=context,
+                    ethical_score=score
+                )
+                
+                with self.lock:
+                    self.frame_ids[submission_id] = frame_id
+                    if score > 0.7:
+                        self.redistribution_log.append(frame_id)
+            except Exception as e:
+                print(f"Failed to store memory frame: {e}")
+            finally:
+                self.store_queue.task_done()
     
     def generate_audit_video(self):
         """Create audit trail video"""
+        # Wait for queued frames so the video covers every logged trade
+        self.store_queue.join()
         self.memory.save_video()
         print(f"📹 Audit video created: alphabot_memories.mp4")
         print(f"   Contains {len(self.memory.frames)} ethical decisions")
@@ -2,25 +2,216 @@
 AI Analyzer - Uses local LLM to analyze trading opportunities
 """
 
-import json
+import math
+import os
+import time
+import hashlib
 from datetime import datetime
 
+from core.jsonio import json_dumps, json_loads, write_atomic
+
+# Shared by every analysis prompt; evaluated once and kept in the KV cache
+ANALYSIS_PROMPT_PREFIX = """
+Analyze the trading opportunity below.
+
+Should we take this trade? Consider:
+1. Risk level
+2. Potential reward
+3. Market conditions
+4. Ethical implications (SolarPunk values)
+
+Respond with JSON:
+{
+    "recommendation": "BUY/SELL/HOLD",
+    "confidence": 1-10,
+    "reason": "brief explanation",
+    "ethical_check": "pass/fail"
+}
+
+Opportunity:
+"""
+
+# GBNF grammar that only admits the JSON object requested above
+ANALYSIS_GRAMMAR = r'''
+root ::= "{" ws "\"recommendation\":" ws recommendation "," ws "\"confidence\":" ws confidence "," ws "\"reason\":" ws string "," ws "\"ethical_check\":" ws check ws "}"
+recommendation ::= "\"BUY\"" | "\"SELL\"" | "\"HOLD\""
+confidence ::= [1-9] | "10"
+check ::= "\"pass\"" | "\"fail\""
+string ::= "\"" ([^"\\\n] | "\\" ["\\/bfnrt])* "\""
+ws ::= [ \t\n]*
+'''
+
 class AIAnalyzer:
     def __init__(self, config):
         self.config = config
         self.model = None
+        self.analysis_grammar = None
+        
+        # Analysis cache: exact prompt hash + near-duplicate feature key
+        self.cache = {}
+        self.cache_ttl = config['ai'].get('cache_ttl_seconds')
+        if self.cache_ttl is None:
+            # Outlive one scan interval so the next scan can reuse the entries
+            self.cache_ttl = config['bot'].get('scan_interval_hours', 6) * 3600 * 1.5
+        self.cache_path = config['ai'].get('cache_path')
+        self.cache_max_entries = config['ai'].get('cache_max_entries', 1000)
+        self.load_cache()
+        
+        # Load eagerly so the first opportunity doesn't pay for reading weights
+        if config['ai'].get('preload', True):
+            self.load_model()
     
     def load_model(self):
         """Load the local LLM model"""
+        ai_config = self.config['ai']
+        if not os.path.exists(ai_config['model_path']):
+            print(f"Model not found at {ai_config['model_path']}, using simulated analysis")
+            return
+        
         try:
-            from llama_cpp import Llama
+            from llama_cpp import Llama, LlamaGrammar
+            n_threads = ai_config.get('n_threads') or self.physical_cores()
             self.model = Llama(
-                model_path=self.config['ai']['model_path'],
-                n_ctx=self.config['ai']['context_size'],
+                model_path=ai_config['model_path'],
+                n_ctx=ai_config['context_size'],
+                n_threads=n_threads,
+                n_threads_batch=ai_config.get('n_threads_batch') or n_threads,
+                n_batch=ai_config.get('n_batch', 512),
+                n_ubatch=ai_config.get('n_ubatch', 512),
+                n_gpu_layers=ai_config.get('n_gpu_layers', 0),
+                use_mmap=True,
+                use_mlock=self.should_mlock(ai_config['model_path']),
                 verbose=False
             )
+            self.analysis_grammar = LlamaGrammar.from_string(ANALYSIS_GRAMMAR, verbose=False)
         except ImportError:
             print("llama-cpp-python not installed, using simulated analysis")
+            return
+        except Exception as e:
+            # Bad weights, an older llama-cpp-python or a grammar error
+            # shouldn't take the bot down at construction
+            print(f"Could not load model: {e}, using simulated analysis")
+            self.model = None
+            self.analysis_grammar = None
+            return
+        
+        self.prefill_prompt_prefix()
+    
+    def physical_cores(self):
+        """Number of physical CPU cores; decode is memory-bound past that"""
+        try:
+            import psutil
+            cores = psutil.cpu_count(logical=False)
+        except ImportError:
+            cores = None
+        
+        return cores or max(1, (os.cpu_count() or 2) // 2)
+    
+    def should_mlock(self, model_path):
+        """Pin weights in RAM when configured, or when they fit comfortably"""
+        use_mlock = self.config['ai'].get('use_mlock')
+        if use_mlock is not None:
+            return use_mlock
+        
+        try:
+            import psutil
+        except ImportError:
+            return False
+        
+        model_size = os.path.getsize(model_path)
+        return psutil.virtual_memory().available > model_size * 1.5
+    
+    def prefill_prompt_prefix(self):
+        """Warm up decoding and keep the static prompt prefix in the KV cache"""
+        # llama.cpp keeps the evaluated tokens and skips the longest common
+        # prefix when the next prompt starts with the same tokens. Generating
+        # a single token also runs the sampling path once, so the first real
+        # analysis doesn't pay any one-off kernel setup cost.
+        try:
+            self.model(ANALYSIS_PROMPT_PREFIX, max_tokens=1)
+        except Exception as e:
+            print(f"Model warm-up failed: {e}")
+    
+    def load_cache(self):
+        """Load persisted analyses from disk, dropping expired entries"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        
+        try:
+            with open(self.cache_path, 'rb') as f:
+                entries = json_loads(f.read())
+        except (OSError, ValueError) as e:
+            print(f"Could not load analysis cache: {e}")
+            return
+        
+        now = time.time()
+        self.cache = {
+            key: entry for key, entry in entries.items()
+            if entry.get('expires', 0) > now
+        }
+    
+    def save_cache(self):
+        """Persist the analysis cache to disk"""
+        if not self.cache_path:
+            return
+        
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        
+        try:
+            write_atomic(self.cache_path, json_dumps(self.cache))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not save analysis cache: {e}")
+    
+    def cache_keys(self, opportunity, prompt):
+        """Build the exact and near-duplicate keys for an opportunity"""
+        exact = 'prompt:' + hashlib.sha1(prompt.encode()).hexdigest()
+        
+        # Prices within ~1% and changes within 0.5 points share an entry
+        price = float(opportunity['price'])
+        price_bucket = round(math.log(price), 2) if price > 0 else f"raw{price}"
+        change_bucket = round(float(opportunity.get('change', 0)) * 2) / 2
+        similar = f"features:{opportunity['symbol']}:{opportunity['type']}:{price_bucket}:{change_bucket}"
+        
+        return exact, similar
+    
+    def cache_get(self, keys):
+        """Return a cached analysis for the first live key, if any"""
+        now = time.time()
+        for key in keys:
+            entry = self.cache.get(key)
+            if entry is None:
+                continue
+            if entry['expires'] <= now:
+                del self.cache[key]
+                continue
+            
+            # Most recently used entries sit at the end of the dict
+            self.cache[key] = self.cache.pop(key)
+            analysis = dict(entry['analysis'])
+            analysis['cached'] = True
+            return analysis
+        
+        return None
+    
+    def cache_put(self, keys, analysis):
+        """Store an analysis under all of its keys"""
+        now = time.time()
+        entry = {'expires': now + self.cache_ttl, 'analysis': analysis}
+        for key in keys:
+            self.cache.pop(key, None)
+            self.cache[key] = entry
+        
+        # Drop expired entries, then the least recently used past the cap;
+        # every analysis is stored under two keys
+        self.cache = {key: cached for key, cached in self.cache.items() if cached['expires'] > now}
+        excess = len(self.cache) - 2 * self.cache_max_entries
+        if excess > 0:
+            for key in list(self.cache)[:excess]:
+                del self.cache[key]
+        
+        self.save_cache()
     
     def analyze(self, opportunity):
         """Analyze a trading opportunity"""
@@ -28,46 +219,61 @@ class AIAnalyzer:
         if self.model is None:
             return self.simulated_analysis(opportunity)
         
-        prompt = f"""
-        Analyze this trading opportunity:
-        
-        Symbol: {opportunity['symbol']}
-        Current Price: ${opportunity['price']}
-        24h Change: {opportunity.get('change', 0)}%
-        Type: {opportunity['type']}
-        
-        Should we take this trade? Consider:
-        1. Risk level
-        2. Potential reward
-        3. Market conditions
-        4. Ethical implications (SolarPunk values)
-        
-        Respond with JSON:
-        {{
-            "recommendation": "BUY/SELL/HOLD",
-            "confidence": 1-10,
-            "reason": "brief explanation",
-            "ethical_check": "pass/fail"
-        }}
-        """
+        # Cheap rules that already decide the outcome skip the LLM call
+        rule_based = self.rule_based_analysis(opportunity)
+        if rule_based is not None:
+            return rule_based
+        
+        # Static instructions come first so llama.cpp can reuse their KV cache
+        prompt = ANALYSIS_PROMPT_PREFIX + f"""
+Symbol: {opportunity['symbol']}
+Current Price: ${opportunity['price']}
+24h Change: {opportunity.get('change', 0)}%
+Type: {opportunity['type']}
+"""
+        
+        keys = self.cache_keys(opportunity, prompt)
+        cached = self.cache_get(keys)
+        if cached is not None:
+            return cached
         
         try:
-            response = self.model(prompt, max_tokens=200, temperature=0.7)
+            # The grammar guarantees a bare JSON object, so no fence stripping
+            response = self.model(
+                prompt,
+                max_tokens=150,
+                temperature=0.7,
+                grammar=self.analysis_grammar
+            )
             analysis_text = response['choices'][0]['text']
             
-            # Extract JSON from response
-            if '```json' in analysis_text:
-                analysis_text = analysis_text.split('```json')[1].split('```')[0]
-            
-            analysis = json.loads(analysis_text.strip())
+            analysis = json_loads(analysis_text)
             analysis['timestamp'] = datetime.now().isoformat()
             
+            self.cache_put(keys, analysis)
             return analysis
             
         except Exception as e:
             print(f"AI analysis failed: {e}")
             return self.simulated_analysis(opportunity)
     
+    def rule_based_analysis(self, opportunity):
+        """Return a HOLD analysis when simple rules rule the trade out, else None"""
+        max_abs_change = self.config['ai'].get('max_abs_change')
+        change = abs(float(opportunity.get('change', 0)))
+        
+        if max_abs_change is not None and change > max_abs_change:
+            return {
+                'recommendation': 'HOLD',
+                'confidence': 10,
+                'reason': f"24h change of {change:.1f}% exceeds the {max_abs_change}% limit",
+                'ethical_check': 'pass',
+                'timestamp': datetime.now().isoformat(),
+                'rule_based': True
+            }
+        
+        return None
+    
     def simulated_analysis(self, opportunity):
         """Fallback simulated analysis"""
         import random
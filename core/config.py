@@ -4,6 +4,95 @@ Configuration loader
 
 import yaml
 import os
+import json
+import copy
+from functools import lru_cache
+
+from core.jsonio import write_atomic
+
+# libyaml's C loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# Built-in defaults; user config files only need to override what differs
+DEFAULT_CONFIG = {
+    'bot': {
+        'name': 'solar-alpha-001',
+        'mode': 'paper',
+        'scan_interval_hours': 6,
+        'risk_tolerance': 'medium',
+        'max_daily_trades': 3,
+        'history_len': 10000,
+        'trade_archive_path': './ledger/trade_archive.jsonl'
+    },
+    'redistribution': {
+        'enabled': True,
+        'split': {
+            'crisis': 50,
+            'you': 30,
+            'network': 20
+        },
+        'crisis_orgs': [
+            {
+                'name': 'World Central Kitchen',
+                'wallet': '0x1234567890abcdef1234567890abcdef12345678',
+                'percentage': 100,
+                'chain': 'ethereum'
+            }
+        ],
+        'your_wallet': '0xYOUR_ADDRESS_HERE',
+        'history_max': 10000
+    },
+    'trading': {
+        'paper_starting_balance': 1000.0,
+        'allowed_markets': ['crypto', 'prediction'],
+        'max_position_size': 100.0,
+        'max_total_exposure': 300.0,
+        'stop_loss': 10,
+        'take_profit': 25
+    },
+    'ai': {
+        'model_path': './models/llama-3.2-7b-q4_k_m.gguf',
+        'context_size': 4096,
+        'temperature': 0.7,
+        'max_tokens': 512,
+        'n_threads': None,
+        'n_batch': 512,
+        'n_gpu_layers': 0,
+        'preload': True,
+        'use_mlock': None,
+        'max_abs_change': 25,
+        'cache_path': './cache/analysis_cache.json',
+        'cache_ttl_seconds': None,
+        'cache_max_entries': 1000
+    },
+    'data_sources': {
+        'crypto': ['BTC-USD', 'ETH-USD', 'SOL-USD'],
+        'prediction_markets': {
+            'predictit': True,
+            'polymarket': False
+        },
+        'cache_seconds': 600
+    },
+    'ledger': {
+        'flush_rows': 50,
+        'flush_seconds': 5
+    },
+    'logging': {
+        'level': 'INFO',
+        'console': True,
+        'file': True,
+        'file_path': './logs/bot.log'
+    },
+    'dashboard': {
+        'enabled': True,
+        'port': 8080,
+        'host': '0.0.0.0',
+        'status_cache_seconds': 5
+    }
+}
 
 def load_config(config_path="config.yaml"):
     """Load configuration from YAML file"""
@@ -11,76 +100,92 @@ def load_config(config_path="config.yaml"):
         print(f"Configuration file not found: {config_path}")
         print("Creating default config...")
         create_default_config(config_path)
+        return copy.deepcopy(DEFAULT_CONFIG)
+    
+    # Parsed once per file version; editing the file triggers a reload
+    mtime = os.stat(config_path).st_mtime_ns
+    return copy.deepcopy(_parse_config(config_path, mtime))
+
+@lru_cache(maxsize=4)
+def _parse_config(config_path, mtime):
+    """Parse a config file over the defaults; cached on (path, mtime)"""
+    config = merge_config(DEFAULT_CONFIG, read_user_config(config_path))
+    validate_split(config['redistribution']['split'])
+    return config
+
+def validate_split(split):
+    """Fill omitted shares with 0 and reject a split that doesn't total 100%"""
+    shares = [split.setdefault(share, 0) for share in ('crisis', 'you', 'network')]
+    if round(sum(shares), 6) != 100:
+        raise ValueError(f"redistribution.split must total 100%, got {sum(shares)}% ({split})")
+
+def read_user_config(config_path):
+    """Read the user's config, via a JSON cache of the parsed YAML when it is fresh"""
+    cache_path = config_path + '.cache.json'
+    
+    # The cache is only valid for the exact file it was built from; a newer
+    # cache would otherwise shadow an older YAML restored from a backup
+    stat = os.stat(config_path)
+    source = [stat.st_mtime_ns, stat.st_size]
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if cached['source'] == source:
+            return cached['config']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
     
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+        user_config = yaml.load(f, Loader=SafeLoader) or {}
+    
+    # Only cache configs that JSON reproduces exactly; int keys, dates and
+    # the like would read back differently, so those always come from YAML
+    try:
+        encoded = json.dumps(user_config)
+    except (TypeError, ValueError):
+        encoded = None
+    
+    if encoded is None or json.loads(encoded) != user_config:
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+        return user_config
+    
+    try:
+        write_atomic(cache_path, json.dumps({'source': source, 'config': user_config}))
+    except OSError as e:
+        print(f"Could not write config cache: {e}")
+    
+    return user_config
+
+# Sections that only make sense as a whole; a user value replaces the
+# default instead of being merged into it (a partial split would otherwise
+# pick up default shares and no longer total 100%)
+REPLACE_WHOLE = {('redistribution', 'split'), ('redistribution', 'crisis_orgs')}
+
+def merge_config(defaults, overrides, path=()):
+    """Recursively merge overrides into a copy of defaults"""
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if (path + (key,)) in REPLACE_WHOLE:
+            merged[key] = copy.deepcopy(value)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value, path + (key,))
+        else:
+            merged[key] = copy.deepcopy(value)
+    
+    return merged
 
 def create_default_config(config_path):
     """Create default configuration file"""
-    default_config = {
-        'bot': {
-            'name': 'solar-alpha-001',
-            'mode': 'paper',
-            'scan_interval_hours': 6,
-            'risk_tolerance': 'medium',
-            'max_daily_trades': 3
-        },
-        'redistribution': {
-            'enabled': True,
-            'split': {
-                'crisis': 50,
-                'you': 30,
-                'network': 20
-            },
-            'crisis_orgs': [
-                {
-                    'name': 'World Central Kitchen',
-                    'wallet': '0x1234567890abcdef1234567890abcdef12345678',
-                    'percentage': 100,
-                    'chain': 'ethereum'
-                }
-            ],
-            'your_wallet': '0xYOUR_ADDRESS_HERE'
-        },
-        'trading': {
-            'paper_starting_balance': 1000.0,
-            'allowed_markets': ['crypto', 'prediction'],
-            'max_position_size': 100.0,
-            'max_total_exposure': 300.0,
-            'stop_loss': 10,
-            'take_profit': 25
-        },
-        'ai': {
-            'model_path': './models/llama-3.2-7b-q4_k_m.gguf',
-            'context_size': 4096,
-            'temperature': 0.7,
-            'max_tokens': 512
-        },
-        'data_sources': {
-            'crypto': ['BTC-USD', 'ETH-USD', 'SOL-USD'],
-            'prediction_markets': {
-                'predictit': True,
-                'polymarket': False
-            }
-        },
-        'logging': {
-            'level': 'INFO',
-            'console': True,
-            'file': True,
-            'file_path': './logs/bot.log'
-        },
-        'dashboard': {
-            'enabled': True,
-            'port': 8080,
-            'host': '0.0.0.0'
-        }
-    }
-    
     # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(config_path), exist_ok=True)
+    config_dir = os.path.dirname(config_path)
+    if config_dir:
+        os.makedirs(config_dir, exist_ok=True)
     
     with open(config_path, 'w') as f:
-        yaml.dump(default_config, f, default_flow_style=False)
+        yaml.dump(DEFAULT_CONFIG, f, Dumper=SafeDumper, default_flow_style=False)
     
     print(f"Default configuration created at: {config_path}")
     print("Please edit with your settings before running.")
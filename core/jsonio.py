@@ -0,0 +1,41 @@
+"""
+JSON I/O - Shared JSON encoding and atomic file writes
+"""
+
+import json
+import os
+
+try:
+    import orjson
+    
+    def json_dumpb(obj):
+        """Serialize to JSON bytes with orjson"""
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC)
+    
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumpb(obj):
+        """Serialize to JSON bytes with the stdlib encoder"""
+        return json.dumps(obj).encode()
+    
+    json_loads = json.loads
+
+def json_dumps(obj):
+    """Serialize to a JSON string"""
+    return json_dumpb(obj).decode()
+
+def write_atomic(path, data):
+    """Replace a file's contents so readers see either the old or the new file"""
+    # A crash or a concurrent reader mid-write never sees a torn file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    try:
+        with open(tmp_path, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -2,10 +2,20 @@
 Public Ledger - Transparent logging of all activities
 """
 
-import json
 import csv
 from datetime import datetime
 import os
+import atexit
+import threading
+
+from core.jsonio import json_dumps
+
+# Column layout of each ledger file
+LEDGER_HEADERS = {
+    'trades.csv': ('ID', 'Timestamp', 'Symbol', 'Price', 'Quantity', 'Profit', 'Analysis'),
+    'cycles.csv': ('Timestamp', 'Opportunities', 'Trades', 'Profit', 'Redistribution'),
+    'donations.csv': ('ID', 'Timestamp', 'Organization', 'Amount', 'Wallet', 'Status')
+}
 
 class PublicLedger:
     def __init__(self, config):
@@ -15,64 +25,157 @@ class PublicLedger:
         # Create ledger directory
         os.makedirs(self.ledger_dir, exist_ok=True)
         
+        # Rows are buffered in memory and appended in batches
+        self.flush_rows = config.get('ledger', {}).get('flush_rows', 50)
+        self.flush_seconds = config.get('ledger', {}).get('flush_seconds', 5)
+        self.pending = {}
+        self.closed = False
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        
+        # One append-mode handle and writer per file for the ledger's lifetime
+        self.files = {}
+        self.writers = {}
+        
         # Initialize CSV files with headers if they don't exist
-        self.init_csv('trades.csv', ['ID', 'Timestamp', 'Symbol', 'Price', 'Quantity', 'Profit', 'Analysis'])
-        self.init_csv('cycles.csv', ['Timestamp', 'Opportunities', 'Trades', 'Profit', 'Redistribution'])
-        self.init_csv('donations.csv', ['ID', 'Timestamp', 'Organization', 'Amount', 'Wallet', 'Status'])
+        for filename, headers in LEDGER_HEADERS.items():
+            self.init_csv(filename, headers)
+        
+        # Disk writes happen on a background writer, off the trading thread
+        self.flush_requested = threading.Event()
+        threading.Thread(target=self.run_writer, daemon=True).start()
+        
+        atexit.register(self.close)
     
     def init_csv(self, filename, headers):
-        """Initialize CSV file with headers if it doesn't exist"""
+        """Open a CSV file for appending, writing headers if it doesn't exist"""
         filepath = os.path.join(self.ledger_dir, filename)
-        if not os.path.exists(filepath):
-            with open(filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
+        is_new = not os.path.exists(filepath)
+        
+        f = open(filepath, 'a', newline='', buffering=1 << 16)
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(headers)
+            f.flush()
+        
+        self.files[filename] = f
+        self.writers[filename] = writer
+        self.pending[filename] = []
+    
+    def append_row(self, filename, row):
+        """Buffer a single row"""
+        self.append_rows(filename, [row])
+    
+    def append_rows(self, filename, rows):
+        """Buffer rows, waking the writer once enough rows are pending"""
+        with self.lock:
+            closed = self.closed
+            if not closed:
+                self.pending[filename].extend(rows)
+                
+                pending_rows = sum(len(buffered) for buffered in self.pending.values())
+                if pending_rows >= self.flush_rows:
+                    self.flush_requested.set()
+        
+        # Late rows (e.g. logged from another atexit hook) still reach disk
+        if closed:
+            self._append_closed(filename, rows)
+    
+    def _append_closed(self, filename, rows):
+        """Append rows straight to a ledger file after the ledger was closed"""
+        with self.write_lock:
+            with open(os.path.join(self.ledger_dir, filename), 'a', newline='') as f:
+                csv.writer(f).writerows(rows)
+    
+    def run_writer(self):
+        """Flush buffered rows when asked or every flush_seconds until closed"""
+        while True:
+            self.flush_requested.wait(self.flush_seconds)
+            self.flush_requested.clear()
+            
+            with self.write_lock:
+                if not self.files:
+                    return
+                
+                self._write_pending()
+    
+    def flush(self):
+        """Write all buffered rows to the open ledger files"""
+        with self.write_lock:
+            self._write_pending()
+    
+    def _write_pending(self):
+        """Write buffered rows; the caller must hold self.write_lock"""
+        # Swap the buffers out under the row lock so loggers never wait on disk
+        with self.lock:
+            batches = {filename: rows for filename, rows in self.pending.items() if rows}
+            for filename in batches:
+                self.pending[filename] = []
+    
+        for filename, rows in batches.items():
+            self.writers[filename].writerows(rows)
+            self.files[filename].flush()
+    
+    def close(self):
+        """Flush buffered rows and close the ledger files"""
+        with self.write_lock:
+            if not self.files:
+                return
+            
+            # Rows logged from here on are written synchronously
+            with self.lock:
+                self.closed = True
+            
+            self._write_pending()
+            for f in self.files.values():
+                f.close()
+            
+            self.files.clear()
+            self.writers.clear()
+        
+        # Let the writer thread notice the ledger is closed
+        self.flush_requested.set()
     
     def log_trade(self, trade):
         """Log a trade to the public ledger"""
-        filepath = os.path.join(self.ledger_dir, 'trades.csv')
-        
-        with open(filepath, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                trade['id'],
-                trade['timestamp'],
-                trade['symbol'],
-                trade['price'],
-                trade.get('quantity', 0),
-                trade.get('profit', 0),
-                json.dumps(trade.get('analysis', {}))
-            ])
+        self.append_row('trades.csv', [
+            trade['id'],
+            trade['timestamp'],
+            trade['symbol'],
+            trade['price'],
+            trade.get('quantity', 0),
+            trade.get('profit', 0),
+            json_dumps(trade.get('analysis', {}))
+        ])
     
     def log_cycle(self, cycle_data):
         """Log a complete cycle"""
-        filepath = os.path.join(self.ledger_dir, 'cycles.csv')
+        self.append_row('cycles.csv', [
+            cycle_data.get('timestamp', datetime.now().isoformat()),
+            cycle_data.get('opportunities', 0),
+            cycle_data.get('trades', 0),
+            cycle_data.get('profit', 0),
+            # Details live in donations.csv; reference them by id. The header
+            # keeps its old name so existing files stay one consistent table
+            cycle_data.get('redistribution_id') or (cycle_data.get('redistribution') or {}).get('id', '')
+        ])
         
-        with open(filepath, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                cycle_data.get('timestamp', datetime.now().isoformat()),
-                cycle_data.get('opportunities', 0),
-                cycle_data.get('trades', 0),
-                cycle_data.get('profit', 0),
-                json.dumps(cycle_data.get('redistribution', {}))
-            ])
+        # A finished cycle is a natural checkpoint: get everything on disk
+        self.flush()
     
     def log_donation(self, donation):
         """Log a donation"""
-        filepath = os.path.join(self.ledger_dir, 'donations.csv')
-        
-        for org in donation.get('crisis_details', []):
-            with open(filepath, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    donation['id'],
-                    donation['timestamp'],
-                    org['organization'],
-                    org['amount'],
-                    org['wallet'],
-                    org['status']
-                ])
+        self.append_rows('donations.csv', [
+            [
+                donation['id'],
+                donation['timestamp'],
+                org['organization'],
+                org['amount'],
+                org['wallet'],
+                org['status']
+            ]
+            for org in donation.get('crisis_details', [])
+        ])
     
     def get_public_url(self):
         """Get public URL for the ledger (for future GitHub Pages integration)"""
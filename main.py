@@ -4,17 +4,17 @@ SolarPunk Alpha Bot - Main Entry Point
 """
 
 import sys
-import time
 import signal
+import asyncio
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-import yaml
-import schedule
 from loguru import logger
 from datetime import datetime
 
+from core.config import load_config
+
 class SolarAlphaBot:
     def __init__(self, config_path="config.yaml"):
         self.load_config(config_path)
@@ -26,8 +26,17 @@ class SolarAlphaBot:
         logger.info(f"Redistribution: {self.config['redistribution']['split']['crisis']}% to crisis orgs")
     
     def load_config(self, config_path):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
+        self.split_profit = self.make_splitter(self.config['redistribution']['split'])
+    
+    def make_splitter(self, split):
+        """Bind the configured split percentages into one function"""
+        crisis, you, network = split['crisis'] / 100, split['you'] / 100, split['network'] / 100
+        
+        def split_profit(profit):
+            return profit * crisis, profit * you, profit * network
+        
+        return split_profit
     
     def setup_logging(self):
         logger.remove()
@@ -68,12 +77,13 @@ class SolarAlphaBot:
         if analysis['recommendation'] != 'BUY':
             return None
         
+        now = datetime.now()
         trade = {
-            "id": f"trade_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "id": f"trade_{now.year}{now.month:02d}{now.day:02d}_{now.hour:02d}{now.minute:02d}{now.second:02d}",
             "symbol": opportunity['symbol'],
             "price": opportunity['price'],
             "quantity": 0.01,  # Small position
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "profit": opportunity['price'] * 0.01  # Simulated 1% profit
         }
         
@@ -82,11 +92,7 @@ class SolarAlphaBot:
     
     def redistribute_profits(self, profit):
         """Redistribute profits according to config"""
-        split = self.config['redistribution']['split']
-        
-        crisis_amount = profit * (split['crisis'] / 100)
-        your_amount = profit * (split['you'] / 100)
-        network_amount = profit * (split['network'] / 100)
+        crisis_amount, your_amount, network_amount = self.split_profit(profit)
         
         logger.info(f"🌍 Redistributing ${profit:.2f}:")
         logger.info(f"  - Crisis orgs: ${crisis_amount:.2f}")
@@ -124,40 +130,54 @@ class SolarAlphaBot:
     def start(self):
         """Start the bot"""
         self.running = True
-        
-        # Set up schedule
+        asyncio.run(self.run_forever())
+    
+    async def run_forever(self):
+        """Run a cycle now, then once per scan interval"""
+        loop = asyncio.get_running_loop()
         interval = self.config['bot']['scan_interval_hours']
-        schedule.every(interval).hours.do(self.run_cycle)
+        
+        # Signals wake the sleep below through the loop's own wakeup fd
+        self.stop_event = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_shutdown)
+            except NotImplementedError:
+                signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(self.request_shutdown))
         
         # Run immediately
-        self.run_cycle()
+        next_cycle = loop.time()
+        await loop.run_in_executor(None, self.run_cycle)
         
         logger.info(f"🚀 Bot started. Will run every {interval} hours.")
         
-        # Keep running
+        # Sleep exactly until the next cycle is due instead of polling
         while self.running:
-            schedule.run_pending()
-            time.sleep(60)
+            next_cycle += interval * 3600
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), max(0, next_cycle - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+            if self.running:
+                await loop.run_in_executor(None, self.run_cycle)
+    
+    def request_shutdown(self):
+        """Stop after the current cycle and wake the main loop"""
+        logger.info("Received shutdown signal")
+        self.running = False
+        self.stop_event.set()
     
     def stop(self):
         """Stop the bot"""
         self.running = False
         logger.info("🛑 Bot stopped")
 
-def signal_handler(signum, frame):
-    logger.info("Received shutdown signal")
-    raise KeyboardInterrupt
-
 if __name__ == "__main__":
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
     bot = SolarAlphaBot()
     
     try:
         bot.start()
-    except KeyboardInterrupt:
-        bot.stop()
     except Exception as e:
         logger.error(f"Bot crashed: {e}")
-        bot.stop()
+    
+    bot.stop()
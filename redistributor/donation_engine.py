@@ -2,39 +2,70 @@
 Donation Engine - Handles automatic redistribution of profits
 """
 
+import secrets
+from collections import deque
 from datetime import datetime
+from itertools import islice
+import numpy as np
 
 class DonationEngine:
     def __init__(self, config):
         self.config = config
-        self.donation_history = []
+        # Bounded so a long-running bot doesn't accumulate every record;
+        # the public ledger keeps the full history
+        history_max = config['redistribution'].get('history_max', 10000)
+        self.donation_history = deque(maxlen=history_max)
+        self._total_donated_cents = 0
+        
+        # Config is fixed for the engine's lifetime, so resolve it once.
+        # Percentages are kept as integer basis points so splits are exact
+        # integer-cent arithmetic rather than float multiplies.
+        split = config['redistribution']['split']
+        self.crisis_bp = int(round(split['crisis'] * 100))
+        self.your_bp = int(round(split['you'] * 100))
+        self.network_bp = int(round(split['network'] * 100))
+        
+        # Each org's share of the crisis pot, in basis points
+        self.crisis_orgs = config['redistribution']['crisis_orgs']
+        self.org_bp = np.array([int(round(org['percentage'] * 100)) for org in self.crisis_orgs], dtype=np.int64)
     
     def distribute(self, profit):
         """Distribute profits according to configured splits"""
         if profit <= 0:
             return None
         
-        split = self.config['redistribution']['split']
+        now = datetime.now()
+        profit_cents = int(profit * 100 + 0.5)
+        your_cents = profit_cents * self.your_bp // 10000
+        network_cents = profit_cents * self.network_bp // 10000
+        crisis_cents = profit_cents * self.crisis_bp // 10000
+        
+        # Flooring each share strands up to a few cents; when the split
+        # covers the whole profit, those go to crisis so the shares add up
+        if self.crisis_bp + self.your_bp + self.network_bp == 10000:
+            crisis_cents = profit_cents - your_cents - network_cents
         
         distribution = {
-            'id': f"dist_{int(datetime.now().timestamp())}",
-            'timestamp': datetime.now().isoformat(),
+            'id': f"dist_{secrets.token_hex(4)}",
+            'timestamp': now.isoformat(),
             'total_profit': profit,
             'breakdown': {
-                'crisis': profit * (split['crisis'] / 100),
-                'you': profit * (split['you'] / 100),
-                'network': profit * (split['network'] / 100)
+                'crisis': crisis_cents / 100,
+                'you': your_cents / 100,
+                'network': network_cents / 100
             },
             'crisis_details': []
         }
         
         # Distribute to crisis organizations
-        for org in self.config['redistribution']['crisis_orgs']:
-            amount = distribution['breakdown']['crisis'] * (org['percentage'] / 100)
-            
+        org_cents = (crisis_cents * self.org_bp // 10000).tolist()
+        if org_cents and int(self.org_bp.sum()) == 10000:
+            # Same for the orgs: the first one takes the leftover cents
+            org_cents[0] += crisis_cents - sum(org_cents)
+        for org, cents in zip(self.crisis_orgs, org_cents):
             org_distribution = {
                 'organization': org['name'],
-                'amount': amount,
+                'amount': cents / 100,
                 'wallet': org['wallet'],
                 'chain': org['chain'],
                 'status': 'PENDING'
@@ -43,17 +74,17 @@ class DonationEngine:
             distribution['crisis_details'].append(org_distribution)
         
         self.donation_history.append(distribution)
+        self._total_donated_cents += crisis_cents
         
         return distribution
     
-    def get_donation_history(self):
-        """Get donation history"""
-        return self.donation_history
+    def get_donation_history(self, limit=None):
+        """Get donation history, optionally only the most recent `limit` entries"""
+        if limit is None:
+            return list(self.donation_history)
+        
+        return list(islice(reversed(self.donation_history), limit))[::-1]
     
     def get_total_donated(self):
         """Get total donated amount"""
-        total = 0
-        for donation in self.donation_history:
-            total += donation['breakdown']['crisis']
-        
-        return total
+        return self._total_donated_cents / 100
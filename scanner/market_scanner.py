@@ -2,64 +2,150 @@
 Market Scanner - Collects data from various sources
 """
 
-import yfinance as yf
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 import time
+from itertools import islice
+from typing import NamedTuple
+
+from core.jsonio import json_loads
+
+# Yahoo serves at most this many symbols per request
+YF_BATCH_SIZE = 20
+
+class PriceBars(NamedTuple):
+    """Cached hourly bars for one symbol"""
+    expires_ns: int
+    close: np.ndarray
+    volume: np.ndarray
+
+def source_enabled(setting):
+    """Accept both `predictit: true` and `predictit: {enabled: true}` forms"""
+    if isinstance(setting, dict):
+        return bool(setting.get('enabled', False))
+    return bool(setting)
 
 class MarketScanner:
     def __init__(self, config):
         self.config = config
+        
+        # Config is fixed for the scanner's lifetime, so resolve it once
+        data_sources = config.get('data_sources', {})
+        prediction_markets = data_sources.get('prediction_markets', {})
+        allowed_markets = set(config.get('trading', {}).get('allowed_markets', ['crypto', 'prediction']))
+        self.crypto_symbols = list(data_sources.get('crypto', [])) if 'crypto' in allowed_markets else []
+        self.predictit_enabled = 'prediction' in allowed_markets and source_enabled(prediction_markets.get('predictit'))
+        
+        # Hourly bars barely move between scans, so reuse them for a while
+        self.price_cache = {}
+        self.cache_seconds = data_sources.get('cache_seconds', 600)
+        
+        # One worker per data source for concurrent scans
+        self.pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='scanner')
+        
+        # Keep-alive session so repeat scans skip the TCP/TLS handshake
+        self.http = requests.Session()
+        self.http.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
+        self.http.headers['Accept-Encoding'] = 'gzip'
     
-    def scan_crypto(self):
+    def scan_crypto(self, scan_ts=None):
         """Scan cryptocurrency markets"""
         opportunities = []
+        timestamp = scan_ts or datetime.now().isoformat()
+        symbols = self.crypto_symbols
+        
+        # Only symbols whose cached bars have expired go back to Yahoo.
+        # Expired bars are dropped first, so a failed refresh yields no
+        # opportunity rather than one built on stale prices.
+        now = time.monotonic_ns()
+        stale = [
+            symbol for symbol in symbols
+            if symbol not in self.price_cache or self.price_cache[symbol].expires_ns <= now
+        ]
+        for symbol in stale:
+            self.price_cache.pop(symbol, None)
+        self.fetch_crypto(stale)
         
-        for symbol in self.config['data_sources']['crypto']:
+        for symbol in symbols:
+            bars = self.price_cache.get(symbol)
+            if bars is None:
+                continue
+            
+            current = float(bars.close[-1])
+            prev = float(bars.close[-2]) if bars.close.size > 1 else current
+            change = ((current - prev) / prev) * 100
+            
+            opportunities.append({
+                'symbol': symbol,
+                'price': current,
+                'change': change,
+                'volume': float(bars.volume[-1]),
+                'type': 'crypto',
+                'timestamp': timestamp
+            })
+        
+        return opportunities
+    
+    def fetch_crypto(self, symbols):
+        """Download hourly closes for symbols into the price cache"""
+        if not symbols:
+            return
+        
+        # yfinance pulls in pandas; only load it once there is something to fetch
+        import yfinance as yf
+        
+        expires_ns = time.monotonic_ns() + int(self.cache_seconds * 1e9)
+        
+        # One download per batch of symbols instead of one request each
+        for start in range(0, len(symbols), YF_BATCH_SIZE):
+            batch = symbols[start:start + YF_BATCH_SIZE]
             try:
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(period="1d", interval="1h")
+                data = yf.download(batch, period="1d", interval="1h", group_by='ticker', auto_adjust=True, actions=False, threads=True, progress=False)
+            except Exception as e:
+                print(f"Error scanning {', '.join(batch)}: {e}")
+                continue
                 
-                if len(data) > 0:
-                    current = data['Close'].iloc[-1]
-                    prev = data['Close'].iloc[-2] if len(data) > 1 else current
-                    change = ((current - prev) / prev) * 100
+            for symbol in batch:
+                try:
+                    # Older yfinance returns flat columns for a single ticker
+                    frame = data[symbol] if data.columns.nlevels > 1 else data
+                    # Keep only the columns we use, as plain arrays; pandas
+                    # indexing costs more than the math on 24 bars
+                    bars = frame[['Close', 'Volume']].dropna().to_numpy(dtype=np.float64)
                     
-                    opportunities.append({
-                        'symbol': symbol,
-                        'price': current,
-                        'change': change,
-                        'type': 'crypto',
-                        'timestamp': datetime.now().isoformat()
-                    })
+                    if len(bars) > 0:
+                        self.price_cache[symbol] = PriceBars(expires_ns, bars[:, 0].copy(), bars[:, 1].copy())
                     
-            except Exception as e:
-                print(f"Error scanning {symbol}: {e}")
-        
-        return opportunities
+                except Exception as e:
+                    print(f"Error scanning {symbol}: {e}")
     
-    def scan_prediction_markets(self):
+    def scan_prediction_markets(self, scan_ts=None):
         """Scan prediction markets"""
         opportunities = []
+        timestamp = scan_ts or datetime.now().isoformat()
         
         # PredictIt
-        if self.config['data_sources']['prediction_markets']['predictit']:
+        if self.predictit_enabled:
             try:
-                response = requests.get('https://www.predictit.org/api/marketdata/all/', timeout=10)
+                response = self.http.get('https://www.predictit.org/api/marketdata/all/', timeout=10)
                 if response.status_code == 200:
-                    markets = response.json().get('markets', [])
+                    markets = json_loads(response.content).get('markets', [])
                     
-                    for market in markets[:5]:  # Top 5 markets
-                        if market.get('status') == 'Open':
-                            opportunities.append({
-                                'symbol': f"PI:{market['id']}",
-                                'price': market.get('volume', 0),
-                                'change': 0,
-                                'type': 'prediction',
-                                'name': market.get('shortName', 'Unknown'),
-                                'timestamp': datetime.now().isoformat()
-                            })
-                            
+                    # Top 5 open markets; stop reading the feed once we have them
+                    open_markets = (market for market in markets if market.get('status') == 'Open')
+                    for market in islice(open_markets, 5):
+                        opportunities.append({
+                            'symbol': f"PI:{market['id']}",
+                            'price': market.get('volume', 0),
+                            'change': 0,
+                            'type': 'prediction',
+                            'name': market.get('shortName', 'Unknown'),
+                            'timestamp': timestamp
+                        })
+                        
             except Exception as e:
                 print(f"Error scanning PredictIt: {e}")
         
@@ -67,8 +153,15 @@ class MarketScanner:
     
     def scan(self):
         """Run all scans"""
+        # Every opportunity from one pass shares the same scan time
+        scan_ts = datetime.now().isoformat()
+        
+        # Each source spends its time waiting on the network, so overlap them
+        crypto = self.pool.submit(self.scan_crypto, scan_ts)
+        prediction = self.pool.submit(self.scan_prediction_markets, scan_ts)
+        
         opportunities = []
-        opportunities.extend(self.scan_crypto())
-        opportunities.extend(self.scan_prediction_markets())
+        opportunities.extend(crypto.result())
+        opportunities.extend(prediction.result())
         
         return opportunities
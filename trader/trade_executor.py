@@ -2,14 +2,71 @@
 Trade Executor - Handles trade execution
 """
 
+import math
+import os
 import time
+import itertools
+from collections import defaultdict, deque
 from datetime import datetime
 
+from core.jsonio import json_dumps
+
+# Analysis fields worth keeping on a long-lived trade record
+TRADE_ANALYSIS_FIELDS = ('recommendation', 'confidence', 'reason', 'ethical_check', 'simulated', 'rule_based', 'cached')
+
+def compact_analysis(analysis):
+    """Keep only the decision-relevant parts of an analysis, with a short reason"""
+    compact = {key: analysis[key] for key in TRADE_ANALYSIS_FIELDS if key in analysis}
+    if isinstance(compact.get('reason'), str):
+        compact['reason'] = compact['reason'][:120]
+    return compact
+
 class TradeExecutor:
     def __init__(self, config):
         self.config = config
         self.positions = {}
-        self.trade_history = []
+        
+        # Limits are in dollars, so exposure is tracked as notional value
+        # (quantity * fill price) alongside the unit positions
+        self.position_values = {}
+        self._total_exposure = 0.0
+        
+        # Recent trades stay in memory; older ones are appended to an archive
+        self.trade_history = deque(maxlen=config['bot'].get('history_len', 10000))
+        self.archive_path = config['bot'].get('trade_archive_path')
+        
+        # Seeded from the clock so ids stay distinct across restarts
+        self.trade_ids = itertools.count(int(time.time() * 1000))
+        
+        # Per-day counts, so the daily limit doesn't scan the history
+        self.daily_trades = defaultdict(int)
+        self._today_cache = (0.0, None)
+        
+        self.load_limits()
+    
+    def load_limits(self):
+        """Snapshot trading limits from the config"""
+        self.max_exposure = self.config['trading']['max_total_exposure']
+        self.max_position = self.config['trading']['max_position_size']
+        self.max_daily = self.config['bot'].get('max_daily_trades')
+        self.paper_mode = self.config['bot']['mode'] == 'paper'
+        self.trade_check = self.make_trade_check()
+    
+    def make_trade_check(self):
+        """Bind the current limits and position state into one check"""
+        max_exposure, max_position = self.max_exposure, self.max_position
+        max_daily = math.inf if self.max_daily is None else self.max_daily
+        position_values, daily_trades, today = self.position_values, self.daily_trades, self._today
+        
+        def trade_check(symbol, total_exposure):
+            # Today's trade count, then total exposure, then the symbol's position
+            return (
+                daily_trades.get(today(), 0) < max_daily
+                and total_exposure < max_exposure
+                and abs(position_values.get(symbol, 0)) < max_position
+            )
+        
+        return trade_check
     
     def execute(self, opportunity, analysis):
         """Execute a trade"""
@@ -20,48 +77,81 @@ class TradeExecutor:
         if not self.can_trade(opportunity['symbol']):
             return None
         
+        # Too small to fill at 6 dp; don't spend a daily slot on it
+        quantity = self.calculate_position_size(opportunity)
+        if quantity <= 0:
+            return None
+        
+        now = datetime.now()
         trade = {
-            'id': f"trade_{int(time.time())}",
+            'id': f"trade_{next(self.trade_ids)}",
             'symbol': opportunity['symbol'],
             'price': opportunity['price'],
-            'quantity': self.calculate_position_size(opportunity),
-            'timestamp': datetime.now().isoformat(),
+            'quantity': quantity,
+            'timestamp': now.isoformat(),
             'analysis': analysis,
-            'status': 'EXECUTED' if self.config['bot']['mode'] == 'paper' else 'PENDING'
+            'status': 'EXECUTED' if self.paper_mode else 'PENDING'
         }
         
-        # Update position
-        self.positions[opportunity['symbol']] = trade['quantity']
-        self.trade_history.append(trade)
+        # Add to the position rather than replacing it
+        self.update_position(opportunity['symbol'], trade['quantity'], trade['price'])
+        if len(self.trade_history) == self.trade_history.maxlen:
+            self.archive_trade(self.trade_history[0])
+        
+        # The caller (and the public ledger) gets the full analysis; the
+        # long-lived history keeps a compact copy
+        record = dict(trade, analysis=compact_analysis(analysis))
+        self.trade_history.append(record)
+        self.daily_trades[self._today()] += 1
         
         return trade
     
-    def can_trade(self, symbol):
-        """Check if we can take a new position"""
-        max_exposure = self.config['trading']['max_total_exposure']
-        max_position = self.config['trading']['max_position_size']
+    def archive_trade(self, trade):
+        """Move a trade that is leaving the in-memory history to the archive"""
+        if not self.archive_path:
+            return
         
-        # Check total exposure
-        total_exposure = sum(self.positions.values())
-        if total_exposure >= max_exposure:
-            return False
+        archive_dir = os.path.dirname(self.archive_path)
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
         
-        # Check individual position
-        current_position = self.positions.get(symbol, 0)
-        if current_position >= max_position:
-            return False
+        try:
+            with open(self.archive_path, 'a') as f:
+                f.write(json_dumps(trade) + '\n')
+        except OSError as e:
+            print(f"Could not archive trade {trade['id']}: {e}")
+    
+    def _today(self):
+        """Current date, re-read from the clock at most once a second"""
+        checked_at, today = self._today_cache
+        now = time.monotonic()
+        if today is None or now - checked_at > 1:
+            today = datetime.now().date()
+            self._today_cache = (now, today)
+        return today
+    
+    def update_position(self, symbol, delta, price):
+        """Adjust a position and keep its notional value and the total exposure in step"""
+        self.positions[symbol] = self.positions.get(symbol, 0) + delta
         
-        return True
+        old = self.position_values.get(symbol, 0)
+        new = old + delta * price
+        self._total_exposure += abs(new) - abs(old)
+        self.position_values[symbol] = new
+    
+    def can_trade(self, symbol):
+        """Check if we can take a new position"""
+        return self.trade_check(symbol, self._total_exposure)
     
     def calculate_position_size(self, opportunity):
         """Calculate position size based on risk"""
-        max_position = self.config['trading']['max_position_size']
-        
         # Simple calculation: use 10% of max position for now
-        position_value = max_position * 0.1
+        position_value = self.max_position * 0.1
         quantity = position_value / opportunity['price']
         
-        return round(quantity, 6)
+        # Round down to 6 dp so we never exceed the budget; the inner round
+        # absorbs float error so exact values don't lose a whole tick
+        return math.floor(round(quantity * 1e6, 9)) / 1e6
     
     def get_open_positions(self):
         """Get all open positions"""
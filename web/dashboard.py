@@ -2,35 +2,23 @@
 Web Dashboard - Simple Flask dashboard for monitoring
 """
 
-from flask import Flask, render_template, jsonify
-import json
-import os
+from flask import Flask, Response, request
+import gzip
+import time
+
+from core.jsonio import json_dumpb
 
 app = Flask(__name__)
+app.config['STATUS_CACHE_SECONDS'] = 5
 
-class Dashboard:
-    def __init__(self, config, bot_state):
-        self.config = config
-        self.bot_state = bot_state
-        self.port = config['dashboard']['port']
-        self.host = config['dashboard']['host']
-    
-    def start(self):
-        """Start the dashboard server"""
-        if not self.config['dashboard']['enabled']:
-            return
-        
-        # Create templates directory if it doesn't exist
-        os.makedirs('templates', exist_ok=True)
-        
-        # Create basic HTML template
-        self.create_template()
-        
-        app.run(host=self.host, port=self.port, debug=False, use_reloader=False)
-    
-    def create_template(self):
-        """Create HTML template for dashboard"""
-        html = '''
+# Encoded /api/status body and when it goes stale, shared by every poller
+_status_cache = (0.0, None, None)
+
+# Bodies smaller than this aren't worth compressing
+GZIP_MIN_BYTES = 1024
+
+# Dashboard page
+_INDEX_HTML = '''
         <!DOCTYPE html>
         <html>
         <head>
@@ -201,25 +189,82 @@ class Dashboard:
         </body>
         </html>
         '''
+
+# What / actually serves: indentation and blank lines stripped, then gzipped once
+_INDEX_HTML_MIN = '\n'.join(line.strip() for line in _INDEX_HTML.splitlines() if line.strip()).encode()
+_INDEX_HTML_GZ = gzip.compress(_INDEX_HTML_MIN, compresslevel=9)
+
+def compress(body):
+    """Gzip a response body, or None when it is too small to bother"""
+    if len(body) < GZIP_MIN_BYTES:
+        return None
+    return gzip.compress(body, compresslevel=6)
+
+def encoded_response(body, gzipped, mimetype):
+    """Build a response, using the gzipped body when the client accepts it"""
+    if gzipped is not None and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = Response(gzipped, mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body, mimetype=mimetype)
+    
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+class Dashboard:
+    def __init__(self, config, bot_state):
+        self.config = config
+        self.bot_state = bot_state
+        self.port = config['dashboard']['port']
+        self.host = config['dashboard']['host']
+        app.config['STATUS_CACHE_SECONDS'] = config['dashboard'].get('status_cache_seconds', 5)
+    
+    def start(self):
+        """Start the dashboard server"""
+        if not self.config['dashboard']['enabled']:
+            return
         
-        with open('templates/index.html', 'w') as f:
-            f.write(html)
+        # Werkzeug's dev server handles one request at a time; waitress
+        # serves concurrent pollers from a thread pool
+        try:
+            from waitress import serve
+        except ImportError:
+            app.run(host=self.host, port=self.port, debug=False, use_reloader=False)
+            return
+        
+        serve(app, host=self.host, port=self.port, threads=8)
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return encoded_response(_INDEX_HTML_MIN, _INDEX_HTML_GZ, 'text/html')
 
-@app.route('/api/status')
-def api_status():
+def build_status():
+    """Collect the dashboard status payload"""
     # This would connect to the actual bot state
-    return jsonify({
+    return {
         'total_profit': 0.0,
         'total_donated': 0.0,
         'total_trades': 0,
         'bot_mode': 'PAPER',
         'recent_trades': [],
         'recent_donations': []
-    })
+    }
+
+@app.route('/api/status')
+def api_status():
+    # Concurrent pollers within the TTL share one encoded body
+    global _status_cache
+    expires, body, gzipped = _status_cache
+    now = time.monotonic()
+    if body is None or now >= expires:
+        body = json_dumpb(build_status())
+        gzipped = compress(body)
+        _status_cache = (now + app.config['STATUS_CACHE_SECONDS'], body, gzipped)
+    
+    response = encoded_response(body, gzipped, 'application/json')
+    # Let browsers and proxies reuse the body for the same window
+    response.headers['Cache-Control'] = f"max-age={app.config['STATUS_CACHE_SECONDS']}"
+    return response
 
 if __name__ == '__main__':
     dashboard = Dashboard({'dashboard': {'enabled': True, 'port': 8080, 'host': '0.0.0.0'}}, None)